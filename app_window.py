@@ -1,117 +1,510 @@
 import sys
 import os
-import google.generativeai as genai
+import time
+import random
+import html
+import asyncio
+import importlib
+import collections
+import threading
 from dotenv import load_dotenv
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QStackedWidget, QLabel, QFrame, QTextEdit, QLineEdit, QScrollArea
+    QStackedWidget, QLabel, QFrame, QScrollArea, QLineEdit
 )
-from PyQt6.QtGui import QFont, QIcon
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve, QRect
-from teacher_page import TeacherPage
-from deaf_student_page import StudentPage
-from mute_studentpage import MuteStudentPage
-from ai_assistant_page import AIAssistantPage  # Import the speaking AI assistant
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, QMutex, QMutexLocker, pyqtSignal
+
+try:
+    import qasync  # Optional: lets assistant requests run as coroutines on the Qt loop
+except ImportError:
+    qasync = None
+
+try:
+    from google.api_core import exceptions as gexc  # Installed with google-generativeai
+except ImportError:
+    gexc = None
 
 # Load environment variables
 load_dotenv()
+_API_KEY = os.getenv('GEMINI_API_KEY')
+
+# Role buttons by tab index: (object name, accent color)
+_ROLE_BUTTONS = (
+    ("teacherBtn", "#4299E1"),
+    ("studentBtn", "#48BB78"),
+    ("muteStudentBtn", "#ED8936"),
+    ("aiAssistantBtn", "#9F7AEA"),
+)
+
+# Application-wide stylesheet. Widgets are styled by object name and role
+# buttons switch state through the "active" property, so nothing is reparsed
+# after startup. Install it once with app.setStyleSheet(APP_QSS).
+APP_QSS = """
+    QWidget {
+        font-family: "Segoe UI";
+    }
+    
+    /* Main window */
+    QWidget#leftContainer {
+        background-color: #F8F9FA;
+    }
+    QFrame#navHeader {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #667eea, stop:1 #764ba2);
+        border: none;
+    }
+    QLabel#navTitle {
+        color: white;
+    }
+    QLabel#navSubtitle {
+        color: rgba(255,255,255,0.9);
+    }
+    QFrame#roleBar {
+        background: white;
+        border-bottom: 1px solid #E2E8F0;
+    }
+    QStackedWidget#pages {
+        background: transparent;
+    }
+    QPushButton[role="true"] {
+        background: white;
+        color: #4A5568;
+        border: 2px solid #E2E8F0;
+        border-radius: 10px;
+        padding: 10px 20px;
+    }
+    
+    /* Collapsible assistant */
+    QPushButton#toggleBtn {
+        background-color: #4299E1;
+        color: white;
+        border: none;
+        border-radius: 25px;
+        font-size: 18px;
+        font-weight: bold;
+    }
+    QPushButton#toggleBtn:hover {
+        background-color: #3182CE;
+    }
+    QLabel#assistantTitle {
+        color: #2D3748;
+    }
+    QPushButton#closeBtn {
+        background-color: #E53E3E;
+        color: white;
+        border-radius: 15px;
+        border: none;
+        font-size: 16px;
+        font-weight: bold;
+    }
+    QPushButton#closeBtn:hover {
+        background-color: #C53030;
+    }
+    QLabel#assistantStatus {
+        color: #718096;
+    }
+    QPushButton#clearChatBtn {
+        background-color: #718096;
+        color: white;
+        border-radius: 6px;
+        border: none;
+        padding: 5px 10px;
+    }
+    QPushButton#clearChatBtn:hover {
+        background-color: #4A5568;
+    }
+    QScrollArea#chat {
+        background-color: #FFFFFF;
+        border: 2px solid #E2E8F0;
+        border-radius: 12px;
+        min-height: 300px;
+    }
+    QWidget#chatContainer {
+        background-color: #FFFFFF;
+    }
+    QLabel#chatMessage {
+        color: #2D3748;
+    }
+    QLineEdit#chatInput {
+        background-color: #FFFFFF;
+        color: #2D3748;
+        border: 2px solid #E2E8F0;
+        border-radius: 8px;
+        padding: 12px 15px;
+    }
+    QLineEdit#chatInput:focus {
+        border-color: #4299E1;
+    }
+    QPushButton#sendBtn {
+        background-color: #4299E1;
+        color: white;
+        border-radius: 8px;
+        border: none;
+    }
+    QPushButton#sendBtn:hover {
+        background-color: #3182CE;
+    }
+    QPushButton#sendBtn:disabled {
+        background-color: #CBD5E0;
+    }
+""" + "".join(
+    f"""
+    QPushButton#{name}:hover, QPushButton#{name}[active="true"] {{
+        background: {color};
+        color: white;
+        border-color: {color};
+    }}
+    """
+    for name, color in _ROLE_BUTTONS
+)
 
-class AIWorker(QThread):
-    """Worker thread for AI processing to prevent UI freezing"""
-    response_received = pyqtSignal(str, bool)  # message, success
+# Shared fonts, built on first use (after QApplication exists)
+_FONTS = {}
+
+def _font(size, weight=QFont.Weight.Normal):
+    """Return a cached Segoe UI font of the given size and weight"""
+    key = (size, weight)
+    if key not in _FONTS:
+        _FONTS[key] = QFont("Segoe UI", size, weight)
+    return _FONTS[key]
+
+# Role pages by tab index: (module, class name, display title). Each page is
+# imported and built the first time its tab is opened.
+_PAGES = {
+    0: ("teacher_page", "TeacherPage", "Teacher Page"),
+    1: ("deaf_student_page", "StudentPage", "Deaf Student Page"),
+    2: ("mute_studentpage", "MuteStudentPage", "Mute Student Page"),
+    3: ("ai_assistant_page", "AIAssistantPage", "AI Assistant Page"),  # The speaking AI assistant
+}
+
+# Chat bubble templates, formatted with already-escaped text
+_USER_TEMPLATE = "<div style='background: #4299E1; color: white; padding: 12px; border-radius: 8px; margin: 8px 0; margin-left: 50px; border-left: 4px solid #2B6CB0;'><b>You:</b> {msg}</div>"
+_ASSISTANT_TEMPLATE = "<div style='background: #F7FAFC; color: #2D3748; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #48BB78;'><b>Assistant:</b> {msg}</div>"
+_ERROR_TEMPLATE = "<div style='background: #FED7D7; color: #C53030; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #E53E3E;'><b>Assistant:</b> {msg}</div>"
+_NOTICE_TEMPLATE = "<div style='background: #FED7D7; color: #C53030; padding: 12px; border-radius: 8px; margin: 8px 0;'><b>Error:</b> {msg}</div>"
+_TYPING_HTML = "<div style='background: #F7FAFC; color: #718096; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #CBD5E0; font-style: italic;'><b>Assistant:</b> Thinking...</div>"
+
+_WELCOME_HTML = """
+<div style='text-align: center; color: #718096; padding: 10px; margin-bottom: 15px;'>
+    <b>Welcome to Classroom Assistant!</b>
+</div>
+<div style='background: #EBF8FF; color: #2B6CB0; padding: 12px; border-radius: 8px; margin: 8px 0; border-left: 4px solid #4299E1;'>
+    <b>Assistant:</b> Hello! I'm your AI classroom assistant. I can help you with:
+    <ul style='margin: 8px 0; padding-left: 20px;'>
+        <li>Homework questions and explanations</li>
+        <li>Study techniques and time management</li>
+        <li>Concept clarification in any subject</li>
+        <li>Assignment planning and guidance</li>
+        <li>Technical help with classroom tools</li>
+    </ul>
+    How can I help you today?
+</div>
+"""
+
+class AIWorkerSignals(QObject):
+    """Signals for AIWorker - QRunnable is not a QObject and can't emit"""
+    chunk_received = pyqtSignal(str)  # partial response text
+    done = pyqtSignal(bool, str)  # success, error message
+
+class AIWorker(QRunnable):
+    """Pooled task for AI processing to prevent UI freezing"""
+    
+    # Gemini streams many small pieces - batch them into fewer, larger
+    # cross-thread signals so the GUI event loop isn't flooded
+    FLUSH_CHARS = 64
+    FLUSH_INTERVAL = 0.05  # seconds
     
     def __init__(self, user_id, message):
         super().__init__()
         self.user_id = user_id
         self.message = message
+        self.signals = AIWorkerSignals()
+        self.setAutoDelete(True)
     
     def run(self):
         try:
-            # Get response from Gemini
-            response = AIAssistant.get_instance().send_message(self.user_id, self.message)
-            if response['success']:
-                self.response_received.emit(response['response'], True)
-            else:
-                error_msg = response.get('error', 'Unknown error occurred')
-                self.response_received.emit(f"AI Error: {error_msg}", False)
+            # All workers share the singleton's Gemini client, whose gRPC channel
+            # stays open between calls - don't create per-call clients here.
+            # Stream the response from Gemini as it is generated
+            assistant = get_ai_assistant()
+            buf = []
+            buffered = 0
+            last_flush = time.monotonic()
+            for text in assistant.send_message_stream(self.user_id, self.message):
+                buf.append(text)
+                buffered += len(text)
+                now = time.monotonic()
+                if buffered > self.FLUSH_CHARS or now - last_flush > self.FLUSH_INTERVAL:
+                    self.signals.chunk_received.emit(''.join(buf))
+                    buf.clear()
+                    buffered = 0
+                    last_flush = now
+            if buf:
+                self.signals.chunk_received.emit(''.join(buf))
+            self.signals.done.emit(True, "")
                 
         except Exception as e:
-            error_msg = f"Connection error: {str(e)}"
-            self.response_received.emit(error_msg, False)
+            error_msg = f"AI Error: {AIAssistant._friendly_error(e)}"
+            self.signals.done.emit(False, error_msg)
 
 class AIAssistant:
-    _instance = None
-    
-    @classmethod
-    def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = AIAssistant()
-        return cls._instance
+    MAX_ATTEMPTS = 4
     
-    def __init__(self):
-        if AIAssistant._instance is not None:
-            raise Exception("This class is a singleton!")
-        
+    def __init__(self, max_users=64, max_history=20):
         # Configure Gemini
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        if not _API_KEY:
             raise ValueError("GEMINI_API_KEY not found in .env file. Please add it to your .env file.")
         
-        genai.configure(api_key=api_key)
+        # Imported here so modules that only need the UI skip the SDK's import cost
+        import google.generativeai as genai
+        
+        # gRPC keeps one persistent HTTP/2 channel that every chat reuses,
+        # so turns after the first skip the TCP/TLS handshake
+        genai.configure(api_key=_API_KEY, transport="grpc")
         
         # Use the working model that was found in your console
         self.model_name = "gemini-2.5-flash"  # Updated to stable model
         self.model = genai.GenerativeModel(self.model_name)
         
-        # Store chats by user ID
-        self.user_chats = {}
+        # Store chats by user ID, least recently used first
+        self.user_chats = collections.OrderedDict()
+        self._max_users = max_users
+        self._max_history = max_history
+        self._lock = threading.Lock()
+        
+        # LRU cache of answers to opening messages, keyed by (user_id, normalized
+        # message). Later turns depend on the conversation, so they are never cached.
+        self._cache = collections.OrderedDict()
+        self._cache_cap = 128
         
         print(f"🤖 Gemini AI Assistant initialized successfully with model: {self.model_name}")
     
     def get_chat(self, user_id):
         """Get or create a chat session for a user"""
-        if user_id not in self.user_chats:
-            self.user_chats[user_id] = self.model.start_chat(history=[])
-        return self.user_chats[user_id]
+        with self._lock:
+            if user_id in self.user_chats:
+                self.user_chats.move_to_end(user_id)
+            else:
+                self._store_chat(user_id, self.model.start_chat(history=[]))
+            return self.user_chats[user_id]
+    
+    def _store_chat(self, user_id, chat):
+        """Make chat the user's most recent session; caller holds self._lock"""
+        self.user_chats[user_id] = chat
+        self.user_chats.move_to_end(user_id)
+        if len(self.user_chats) > self._max_users:
+            self.user_chats.popitem(last=False)
+    
+    def _replay_cached(self, user_id, key, message):
+        """Return the cached answer to an opening message, recording the turn in the chat"""
+        with self._lock:
+            chat = self.user_chats.get(user_id)
+            if chat is not None and chat.history:
+                return None
+            text = self._cache.get(key)
+            if text is None:
+                return None
+            self._cache.move_to_end(key)
+            # The turn still belongs in the history so follow-ups have context
+            self._store_chat(user_id, self.model.start_chat(history=[
+                {'role': 'user', 'parts': [message]},
+                {'role': 'model', 'parts': [text]},
+            ]))
+            return text
+    
+    def _trim_history(self, user_id, chat):
+        """Restart a chat from its most recent turns once its history grows too long"""
+        history = chat.history
+        if len(history) <= self._max_history:
+            return
+        # Keep an even number of entries so the new history starts on a user turn
+        keep = self._max_history - self._max_history % 2
+        with self._lock:
+            if self.user_chats.get(user_id) is chat:
+                self.user_chats[user_id] = self.model.start_chat(history=history[-keep:])
     
     def send_message(self, user_id, message):
         """Send message to AI and get response"""
+        key = (user_id, message.strip().lower())
+        cached = self._replay_cached(user_id, key, message)
+        if cached is not None:
+            return {
+                'success': True,
+                'response': cached
+            }
+        
         try:
             chat = self.get_chat(user_id)
-            response = chat.send_message(message)
+            opening = not chat.history
+            response = self._with_retry(lambda: chat.send_message(message))
+            if opening:
+                self._remember(key, response.text)
+            self._trim_history(user_id, chat)
             return {
                 'success': True,
                 'response': response.text
             }
         except Exception as e:
-            error_msg = str(e)
-            # Provide more user-friendly error messages
-            if "API_KEY_INVALID" in error_msg:
-                error_msg = "Invalid API key. Please check your GEMINI_API_KEY in the .env file."
-            elif "quota" in error_msg.lower():
-                error_msg = "API quota exceeded. Please try again later."
-            elif "503" in error_msg:
-                error_msg = "Service temporarily unavailable. Please try again."
-            elif "429" in error_msg:
-                error_msg = "Too many requests. Please wait a moment."
-            
             return {
                 'success': False,
-                'error': error_msg
+                'error': self._friendly_error(e)
             }
     
+    def send_message_stream(self, user_id, message):
+        """Send message to AI and yield the response text as it arrives"""
+        key = (user_id, message.strip().lower())
+        cached = self._replay_cached(user_id, key, message)
+        if cached is not None:
+            yield cached
+            return
+        
+        chat = self.get_chat(user_id)
+        opening = not chat.history
+        parts = []
+        # Only the opening request is retried; a stream that fails midway is not replayed
+        stream = self._with_retry(lambda: chat.send_message(message, stream=True))
+        for chunk in stream:
+            parts.append(chunk.text)
+            yield chunk.text
+        if opening:
+            self._remember(key, "".join(parts))
+        self._trim_history(user_id, chat)
+    
+    async def send_message_stream_async(self, user_id, message):
+        """Async version of send_message_stream for use on a running asyncio loop"""
+        key = (user_id, message.strip().lower())
+        cached = self._replay_cached(user_id, key, message)
+        if cached is not None:
+            yield cached
+            return
+        
+        chat = self.get_chat(user_id)
+        opening = not chat.history
+        parts = []
+        # Only the opening request is retried; a stream that fails midway is not replayed
+        stream = await self._with_retry_async(lambda: chat.send_message_async(message, stream=True))
+        async for chunk in stream:
+            parts.append(chunk.text)
+            yield chunk.text
+        if opening:
+            self._remember(key, "".join(parts))
+        self._trim_history(user_id, chat)
+    
+    def _with_retry(self, send):
+        """Call send(), retrying transient errors with exponential backoff"""
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                return send()
+            except Exception as e:
+                time.sleep(self._retry_delay(attempt, e))
+    
+    async def _with_retry_async(self, send):
+        """Await send(), retrying transient errors with exponential backoff"""
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                return await send()
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(attempt, e))
+    
+    def _retry_delay(self, attempt, error):
+        """Seconds to wait before retrying after error; re-raises it when giving up"""
+        if attempt == self.MAX_ATTEMPTS - 1 or not self._is_retryable(error):
+            raise error
+        return self._backoff_delay(attempt)
+    
+    @staticmethod
+    def _backoff_delay(attempt):
+        """Seconds to wait before the next attempt: 0.5s doubling up to 8s, plus jitter"""
+        return min(8, 0.5 * 2 ** attempt) + random.random() * 0.25
+    
+    @staticmethod
+    def _is_retryable(error):
+        """Overload and network errors are worth retrying; bad keys and quota are not"""
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+        if gexc is not None:
+            # gRPC raises ResourceExhausted for every 429, rate limits included
+            if isinstance(error, (gexc.TooManyRequests, gexc.ServiceUnavailable, gexc.DeadlineExceeded)):
+                return not AIAssistant._is_quota_error(error)
+            return False
+        error_msg = str(error)
+        if "API_KEY_INVALID" in error_msg or AIAssistant._is_quota_error(error):
+            return False
+        return "429" in error_msg or "503" in error_msg
+    
+    @staticmethod
+    def _is_quota_error(error):
+        """True when a 429 comes from a daily or billing quota rather than a rate limit"""
+        details = getattr(error, "details", None) or ()
+        text = " ".join([str(error), *map(str, details)]).lower()
+        if any(marker in text for marker in ("billing", "perday", "per day")):
+            return True
+        # Per-minute quota violations clear on their own, so they stay retryable
+        return "quota" in text and "perminute" not in text and "per minute" not in text
+    
+    def _remember(self, key, text):
+        """Store a response in the LRU cache, evicting the oldest entry"""
+        with self._lock:
+            self._cache[key] = text
+            if len(self._cache) > self._cache_cap:
+                self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _friendly_error(error):
+        """Provide more user-friendly error messages"""
+        if gexc is not None:
+            if isinstance(error, (gexc.Unauthenticated, gexc.PermissionDenied)):
+                return "Invalid API key. Please check your GEMINI_API_KEY in the .env file."
+            # Covers ResourceExhausted, which gRPC raises for every 429
+            if isinstance(error, gexc.TooManyRequests):
+                if AIAssistant._is_quota_error(error):
+                    return "API quota exceeded. Please try again later."
+                return "Too many requests. Please wait a moment."
+            if isinstance(error, gexc.ServiceUnavailable):
+                return "Service temporarily unavailable. Please try again."
+        
+        # Gemini reports a bad key as a plain InvalidArgument, so that one
+        # still needs the message text
+        error_msg = str(error)
+        if "API_KEY_INVALID" in error_msg:
+            error_msg = "Invalid API key. Please check your GEMINI_API_KEY in the .env file."
+        elif AIAssistant._is_quota_error(error):
+            error_msg = "API quota exceeded. Please try again later."
+        elif "503" in error_msg:
+            error_msg = "Service temporarily unavailable. Please try again."
+        elif "429" in error_msg:
+            error_msg = "Too many requests. Please wait a moment."
+        return error_msg
+    
     def clear_chat(self, user_id):
         """Clear chat history for a user"""
-        if user_id in self.user_chats:
-            self.user_chats[user_id] = self.model.start_chat(history=[])
-            return True
-        return False
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == user_id]:
+                del self._cache[key]
+            if user_id in self.user_chats:
+                self.user_chats[user_id] = self.model.start_chat(history=[])
+                return True
+            return False
+
+_assistant = None
+_assistant_lock = threading.Lock()
+
+def get_ai_assistant():
+    """Return the shared AIAssistant, creating it on first use"""
+    global _assistant
+    if _assistant is None:
+        # Without the lock, two threads making the first call could each build
+        # an AIAssistant and call genai.configure twice, mid-request
+        with _assistant_lock:
+            if _assistant is None:
+                _assistant = AIAssistant()
+    return _assistant
 
 class CollapsibleAIAssistant(QWidget):
     def __init__(self):
         super().__init__()
         self.is_expanded = False
-        self.animation_duration = 300
         self.init_ui()
         
     def init_ui(self):
@@ -124,19 +517,7 @@ class CollapsibleAIAssistant(QWidget):
         self.toggle_btn = QPushButton("🤖")
         self.toggle_btn.setFixedSize(50, 50)
         self.toggle_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.toggle_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4299E1;
-                color: white;
-                border: none;
-                border-radius: 25px;
-                font-size: 18px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #3182CE;
-            }
-        """)
+        self.toggle_btn.setObjectName("toggleBtn")
         self.toggle_btn.clicked.connect(self.toggle_assistant)
         
         # AI Assistant Widget
@@ -187,7 +568,19 @@ class AIAssistantWidget(QWidget):
         super().__init__()
         self.current_user_id = "student_user"  # You can make this dynamic based on login
         self.ai_worker = None
-        self.typing_indicator_added = False
+        self._ai_task = None
+        # A private pool: sizing the global one would also throttle other
+        # pages' tasks (e.g. the student page's session join)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(4)
+        self._typing_label = None
+        self._stream_label = None
+        self._stream_text = ""
+        
+        # One request in flight per widget; later messages wait in order
+        self._pending = collections.deque()
+        self._inflight = False
+        self._queue_mutex = QMutex()
         self.init_ui()
         
     def init_ui(self):
@@ -199,25 +592,13 @@ class AIAssistantWidget(QWidget):
         header_layout = QHBoxLayout()
         
         title = QLabel("🤖 Classroom Assistant")
-        title.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
-        title.setStyleSheet("color: #2D3748;")
+        title.setFont(_font(14, QFont.Weight.Bold))
+        title.setObjectName("assistantTitle")
         
         self.close_btn = QPushButton("×")
         self.close_btn.setFixedSize(30, 30)
         self.close_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #E53E3E;
-                color: white;
-                border-radius: 15px;
-                border: none;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #C53030;
-            }
-        """)
+        self.close_btn.setObjectName("closeBtn")
         
         header_layout.addWidget(title)
         header_layout.addStretch()
@@ -226,45 +607,34 @@ class AIAssistantWidget(QWidget):
         
         # Status label
         self.status_label = QLabel("Ready")
-        self.status_label.setFont(QFont("Segoe UI", 9))
-        self.status_label.setStyleSheet("color: #718096; text-align: center;")
+        self.status_label.setFont(_font(9))
+        self.status_label.setObjectName("assistantStatus")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.status_label)
         
         # Clear chat button
         clear_btn = QPushButton("Clear Chat")
-        clear_btn.setFont(QFont("Segoe UI", 10))
+        clear_btn.setFont(_font(10))
         clear_btn.setFixedHeight(30)
         clear_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        clear_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #718096;
-                color: white;
-                border-radius: 6px;
-                border: none;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: #4A5568;
-            }
-        """)
+        clear_btn.setObjectName("clearChatBtn")
         clear_btn.clicked.connect(self.clear_chat)
         layout.addWidget(clear_btn)
         
-        # Chat display area
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
-        self.chat_display.setFont(QFont("Segoe UI", 11))
-        self.chat_display.setStyleSheet("""
-            QTextEdit {
-                background-color: #FFFFFF;
-                color: #2D3748;
-                border: 2px solid #E2E8F0;
-                border-radius: 12px;
-                padding: 15px;
-                min-height: 300px;
-            }
-        """)
+        # Chat display area - one label per message, so appending only lays out
+        # the new bubble instead of the whole conversation
+        self.chat_display = QScrollArea()
+        self.chat_display.setWidgetResizable(True)
+        self.chat_display.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.chat_display.setObjectName("chat")
+        
+        chat_container = QWidget()
+        chat_container.setObjectName("chatContainer")
+        self.chat_layout = QVBoxLayout(chat_container)
+        self.chat_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.chat_layout.setContentsMargins(15, 15, 15, 15)
+        self.chat_layout.setSpacing(0)
+        self.chat_display.setWidget(chat_container)
         layout.addWidget(self.chat_display)
         
         # Chat input area
@@ -273,43 +643,16 @@ class AIAssistantWidget(QWidget):
         
         self.chat_input = QLineEdit()
         self.chat_input.setPlaceholderText("Ask me anything...")
-        self.chat_input.setFont(QFont("Segoe UI", 11))
-        self.chat_input.setStyleSheet("""
-            QLineEdit {
-                background-color: #FFFFFF;
-                color: #2D3748;
-                border: 2px solid #E2E8F0;
-                border-radius: 8px;
-                padding: 12px 15px;
-            }
-            QLineEdit:focus {
-                border-color: #4299E1;
-            }
-            QLineEdit::placeholder {
-                color: #A0AEC0;
-            }
-        """)
+        self.chat_input.setFont(_font(11))
+        self.chat_input.setObjectName("chatInput")
         self.chat_input.returnPressed.connect(self.send_message)
         input_layout.addWidget(self.chat_input)
         
         self.send_btn = QPushButton("Send")
-        self.send_btn.setFont(QFont("Segoe UI", 11, QFont.Weight.Medium))
+        self.send_btn.setFont(_font(11, QFont.Weight.Medium))
         self.send_btn.setFixedSize(80, 45)
         self.send_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.send_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4299E1;
-                color: white;
-                border-radius: 8px;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #3182CE;
-            }
-            QPushButton:disabled {
-                background-color: #CBD5E0;
-            }
-        """)
+        self.send_btn.setObjectName("sendBtn")
         self.send_btn.clicked.connect(self.send_message)
         input_layout.addWidget(self.send_btn)
         
@@ -332,23 +675,7 @@ class AIAssistantWidget(QWidget):
     
     def show_welcome_message(self):
         """Show welcome message in chat"""
-        welcome_html = """
-        <div style='text-align: center; color: #718096; padding: 10px; margin-bottom: 15px;'>
-            <b>Welcome to Classroom Assistant!</b>
-        </div>
-        <div style='background: #EBF8FF; color: #2B6CB0; padding: 12px; border-radius: 8px; margin: 8px 0; border-left: 4px solid #4299E1;'>
-            <b>Assistant:</b> Hello! I'm your AI classroom assistant. I can help you with:
-            <ul style='margin: 8px 0; padding-left: 20px;'>
-                <li>Homework questions and explanations</li>
-                <li>Study techniques and time management</li>
-                <li>Concept clarification in any subject</li>
-                <li>Assignment planning and guidance</li>
-                <li>Technical help with classroom tools</li>
-            </ul>
-            How can I help you today?
-        </div>
-        """
-        self.chat_display.setHtml(welcome_html)
+        self.append_to_chat(_WELCOME_HTML)
     
     def send_message(self):
         """Handle sending messages to Gemini AI"""
@@ -359,24 +686,107 @@ class AIAssistantWidget(QWidget):
             
             # Disable input while processing
             self.set_input_enabled(False)
-            self.update_status("Processing...")
             
             # Add user message to chat
             self.add_message(message, "user")
             self.chat_input.clear()
             
+            with QMutexLocker(self._queue_mutex):
+                self._pending.append(message)
+            self._drain()
+            
+        except Exception as e:
+            print(f"Error sending message: {e}")
+            self.set_input_enabled(True)
+            self.update_status("Error - try again")
+    
+    def _drain(self):
+        """Start the next queued message unless a request is already in flight"""
+        with QMutexLocker(self._queue_mutex):
+            if self._inflight or not self._pending:
+                return
+            message = self._pending.popleft()
+            # Repeated submits of the same prompt collapse into one request
+            while self._pending and self._pending[0] == message:
+                self._pending.popleft()
+            self._inflight = True
+        
+        try:
+            self.update_status("Processing...")
+            
             # Show typing indicator
             self.add_typing_indicator()
             
-            # Start AI worker thread
-            self.ai_worker = AIWorker(self.current_user_id, message)
-            self.ai_worker.response_received.connect(self.handle_ai_response)
-            self.ai_worker.start()
+            # On a qasync loop the request is just a coroutine - no thread needed
+            if self._async_loop() is not None:
+                # The loop only holds tasks weakly; keep ours until it is done
+                self._ai_task = asyncio.ensure_future(self._send_message_async(message))
+                self._ai_task.add_done_callback(self._on_ai_task_done)
+                return
+            
+            # Otherwise queue AI worker on the shared thread pool
+            worker = AIWorker(self.current_user_id, message)
+            # Workers emit from pool threads - always deliver on the GUI thread
+            queued = Qt.ConnectionType.QueuedConnection
+            worker.signals.chunk_received.connect(self.handle_ai_chunk, queued)
+            worker.signals.done.connect(self.handle_ai_done, queued)
+            # Free the signals object once its final signal has been handled
+            worker.signals.done.connect(worker.signals.deleteLater, queued)
+            # Keep the signals object alive until the response is delivered
+            self.ai_worker = worker.signals
+            self.pool.start(worker)
             
         except Exception as e:
             print(f"Error sending message: {e}")
-            self.set_input_enabled(True)
             self.update_status("Error - try again")
+            self._request_finished()
+    
+    def _on_ai_task_done(self, task):
+        """Drop the reference to a finished assistant request"""
+        if self._ai_task is task:
+            self._ai_task = None
+    
+    def _request_finished(self):
+        """Mark the in-flight request done and move on to the next queued one"""
+        with QMutexLocker(self._queue_mutex):
+            self._inflight = False
+            idle = not self._pending
+        if idle:
+            self.set_input_enabled(True)
+        else:
+            self._drain()
+    
+    def _async_loop(self):
+        """Return the running qasync loop, or None when Qt drives the event loop"""
+        if qasync is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return loop if isinstance(loop, qasync.QEventLoop) else None
+    
+    async def _send_message_async(self, message):
+        """Stream Gemini's reply on the event loop thread, batching chunks like AIWorker"""
+        buf = []
+        buffered = 0
+        last_flush = time.monotonic()
+        try:
+            stream = get_ai_assistant().send_message_stream_async(self.current_user_id, message)
+            async for text in stream:
+                buf.append(text)
+                buffered += len(text)
+                now = time.monotonic()
+                if buffered > AIWorker.FLUSH_CHARS or now - last_flush > AIWorker.FLUSH_INTERVAL:
+                    self.handle_ai_chunk(''.join(buf))
+                    buf.clear()
+                    buffered = 0
+                    last_flush = now
+            if buf:
+                self.handle_ai_chunk(''.join(buf))
+            self.handle_ai_done(True, "")
+        except Exception as e:
+            self.handle_ai_done(False, f"AI Error: {AIAssistant._friendly_error(e)}")
     
     def set_input_enabled(self, enabled):
         """Enable or disable chat input"""
@@ -388,49 +798,52 @@ class AIAssistantWidget(QWidget):
     def add_typing_indicator(self):
         """Show typing indicator"""
         try:
-            typing_html = """
-            <div style='background: #F7FAFC; color: #718096; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #CBD5E0; font-style: italic;'>
-                <b>Assistant:</b> Thinking...
-            </div>
-            """
-            self.append_to_chat(typing_html)
-            self.typing_indicator_added = True
+            self._typing_label = self.append_to_chat(_TYPING_HTML)
         except Exception as e:
             print(f"Error adding typing indicator: {e}")
     
     def remove_typing_indicator(self):
         """Remove the typing indicator safely"""
         try:
-            if not self.typing_indicator_added:
+            if self._typing_label is None:
                 return
-                
-            # Get current HTML content
-            current_html = self.chat_display.toHtml()
-            
-            # Safe way to remove typing indicator
-            if "Thinking..." in current_html:
-                # Split by div tags and filter out the typing indicator
-                parts = current_html.split('<div style=')
-                new_parts = []
-                typing_removed = False
-                
-                for part in parts:
-                    if "Thinking..." in part and not typing_removed:
-                        typing_removed = True
-                        continue
-                    new_parts.append(part)
-                
-                # Rebuild HTML
-                if typing_removed:
-                    new_html = '<div style='.join(new_parts)
-                    self.chat_display.setHtml(new_html)
             
-            self.typing_indicator_added = False
+            # The indicator is its own label - drop just that widget
+            self.chat_layout.removeWidget(self._typing_label)
+            self._typing_label.deleteLater()
             
         except Exception as e:
             print(f"Error removing typing indicator: {e}")
-            # If anything fails, just clear the typing indicator flag
-            self.typing_indicator_added = False
+        finally:
+            self._typing_label = None
+    
+    def handle_ai_chunk(self, text):
+        """Render a streamed piece of the AI response"""
+        try:
+            self._stream_text += text
+            formatted_message = self.escape_html(self._stream_text).replace('\n', '<br>')
+            message_html = _ASSISTANT_TEMPLATE.format(msg=formatted_message)
+            if self._stream_label is None:
+                # First chunk: replace the typing indicator with a message bubble
+                self.remove_typing_indicator()
+                self._stream_label = self.append_to_chat(message_html)
+            else:
+                # Only the streaming bubble is re-laid out
+                self._stream_label.setText(message_html)
+                self.scroll_to_bottom()
+        except Exception as e:
+            print(f"Error rendering AI chunk: {e}")
+    
+    def handle_ai_done(self, success, error):
+        """Finish a streamed AI response"""
+        self._stream_label = None
+        self._stream_text = ""
+        if not success:
+            self.handle_ai_response(error, False)
+            return
+        self.remove_typing_indicator()
+        self.update_status("Ready to help!")
+        self._request_finished()
     
     def handle_ai_response(self, response, success):
         """Handle AI response from worker thread"""
@@ -442,96 +855,79 @@ class AIAssistantWidget(QWidget):
                 self.add_message(response, "assistant")
                 self.update_status("Ready to help!")
             else:
-                error_html = f"""
-                <div style='background: #FED7D7; color: #C53030; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #E53E3E;'>
-                    <b>Assistant:</b> {self.escape_html(response)}
-                </div>
-                """
-                self.append_to_chat(error_html)
+                self.append_to_chat(_ERROR_TEMPLATE.format(msg=self.escape_html(response)))
                 self.update_status("Error occurred")
             
         except Exception as e:
             print(f"Error handling AI response: {e}")
-            error_html = f"""
-            <div style='background: #FED7D7; color: #C53030; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #E53E3E;'>
-                <b>Assistant:</b> Error processing response: {self.escape_html(str(e))}
-            </div>
-            """
-            self.append_to_chat(error_html)
+            self.append_to_chat(_ERROR_TEMPLATE.format(msg=f"Error processing response: {self.escape_html(str(e))}"))
             self.update_status("Processing error")
         finally:
-            # Always re-enable input
-            self.set_input_enabled(True)
+            # Always release the queue so input is re-enabled
+            self._request_finished()
     
     def escape_html(self, text):
         """Escape HTML special characters to prevent rendering issues"""
         if not text:
             return ""
-        return (text.replace('&', '&amp;')
-                  .replace('<', '&lt;')
-                  .replace('>', '&gt;')
-                  .replace('"', '&quot;')
-                  .replace("'", '&#39;'))
+        return html.escape(text, quote=True)
     
     def add_message(self, message, sender):
         """Add a message to the chat display"""
         try:
             if sender == "user":
-                html = f"""
-                <div style='background: #4299E1; color: white; padding: 12px; border-radius: 8px; margin: 8px 0; margin-left: 50px; border-left: 4px solid #2B6CB0;'>
-                    <b>You:</b> {self.escape_html(message)}
-                </div>
-                """
+                message_html = _USER_TEMPLATE.format(msg=self.escape_html(message))
             else:
                 # Format AI response with better readability
                 formatted_message = self.escape_html(message).replace('\n', '<br>')
-                html = f"""
-                <div style='background: #F7FAFC; color: #2D3748; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #48BB78;'>
-                    <b>Assistant:</b> {formatted_message}
-                </div>
-                """
+                message_html = _ASSISTANT_TEMPLATE.format(msg=formatted_message)
             
-            self.append_to_chat(html)
+            self.append_to_chat(message_html)
             
         except Exception as e:
             print(f"Error adding message: {e}")
             # Fallback: add plain text message
-            fallback_html = f"""
-            <div style='background: #F7FAFC; color: #2D3748; padding: 12px; border-radius: 8px; margin: 8px 0; margin-right: 50px; border-left: 4px solid #48BB78;'>
-                <b>Assistant:</b> Message display error
-            </div>
-            """
-            self.append_to_chat(fallback_html)
-    
-    def append_to_chat(self, html):
-        """Append HTML to chat and scroll to bottom"""
+            self.append_to_chat(_ASSISTANT_TEMPLATE.format(msg="Message display error"))
+    
+    def append_to_chat(self, message_html):
+        """Append an HTML message bubble to chat and scroll to bottom"""
         try:
-            current_html = self.chat_display.toHtml()
-            new_html = current_html + html
-            self.chat_display.setHtml(new_html)
+            label = QLabel(message_html)
+            label.setTextFormat(Qt.TextFormat.RichText)
+            label.setWordWrap(True)
+            label.setFont(_font(11))
+            label.setObjectName("chatMessage")
+            label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+            self.chat_layout.addWidget(label)
             
             # Auto-scroll to bottom
-            scrollbar = self.chat_display.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+            self.scroll_to_bottom()
+            return label
             
         except Exception as e:
             print(f"Error appending to chat: {e}")
+            return None
+    
+    def scroll_to_bottom(self):
+        """Scroll chat to the newest message once the layout has updated"""
+        scroll_bar = self.chat_display.verticalScrollBar()
+        QTimer.singleShot(0, lambda: scroll_bar.setValue(scroll_bar.maximum()))
     
     def clear_chat(self):
         """Clear chat history"""
         try:
-            AIAssistant.get_instance().clear_chat(self.current_user_id)
-            self.chat_display.clear()
-            self.typing_indicator_added = False
+            get_ai_assistant().clear_chat(self.current_user_id)
+            while self.chat_layout.count():
+                item = self.chat_layout.takeAt(0)
+                if item.widget() is not None:
+                    item.widget().deleteLater()
+            self._typing_label = None
+            self._stream_label = None
+            self._stream_text = ""
             self.show_welcome_message()
             self.update_status("Chat cleared")
         except Exception as e:
-            error_html = f"""
-            <div style='background: #FED7D7; color: #C53030; padding: 12px; border-radius: 8px; margin: 8px 0;'>
-                <b>Error:</b> Failed to clear chat: {self.escape_html(str(e))}
-            </div>
-            """
-            self.append_to_chat(error_html)
+            self.append_to_chat(_NOTICE_TEMPLATE.format(msg=f"Failed to clear chat: {self.escape_html(str(e))}"))
 
 # MainInterface class with collapsible AI Assistant
 class MainInterface(QWidget):
@@ -543,13 +939,20 @@ class MainInterface(QWidget):
         
         # Initialize AI Assistant
         try:
-            self.ai_assistant_instance = AIAssistant.get_instance()
+            self.ai_assistant_instance = get_ai_assistant()
         except Exception as e:
             print(f"AI Assistant initialization failed: {e}")
             # Continue without AI functionality
         
         self.init_ui()
         self.setup_connections()
+        
+        # Start the assistant's chat session now so the first message doesn't pay
+        # for it - on the widget's pool, since get_chat is locked and thread-safe
+        if hasattr(self, 'ai_assistant_instance'):
+            widget = self.ai_assistant.assistant_widget
+            user_id = widget.current_user_id
+            widget.pool.start(lambda: self.ai_assistant_instance.get_chat(user_id))
 
     def init_ui(self):
         # Main layout
@@ -559,7 +962,7 @@ class MainInterface(QWidget):
 
         # Left side: Main content
         self.left_container = QWidget()
-        self.left_container.setStyleSheet("background-color: #F8F9FA;")
+        self.left_container.setObjectName("leftContainer")
         left_layout = QVBoxLayout(self.left_container)
         left_layout.setContentsMargins(0, 0, 0, 0)
         left_layout.setSpacing(0)
@@ -567,26 +970,20 @@ class MainInterface(QWidget):
         # Navigation header
         nav_header = QFrame()
         nav_header.setFixedHeight(80)
-        nav_header.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #667eea, stop:1 #764ba2);
-                border: none;
-            }
-        """)
+        nav_header.setObjectName("navHeader")
         nav_layout = QVBoxLayout(nav_header)
         nav_layout.setContentsMargins(25, 12, 25, 12)
         
         # App title
         title_label = QLabel(" Include Classroom Platform")
-        title_label.setFont(QFont("Segoe UI", 22, QFont.Weight.Bold))
-        title_label.setStyleSheet("color: white;")
+        title_label.setFont(_font(22, QFont.Weight.Bold))
+        title_label.setObjectName("navTitle")
         nav_layout.addWidget(title_label)
         
         # Subtitle
         subtitle_label = QLabel("Real-time transcription & communication")
-        subtitle_label.setFont(QFont("Segoe UI", 12))
-        subtitle_label.setStyleSheet("color: rgba(255,255,255,0.9);")
+        subtitle_label.setFont(_font(12))
+        subtitle_label.setObjectName("navSubtitle")
         nav_layout.addWidget(subtitle_label)
         
         left_layout.addWidget(nav_header)
@@ -594,20 +991,15 @@ class MainInterface(QWidget):
         # Role selection buttons
         button_container = QFrame()
         button_container.setFixedHeight(70)
-        button_container.setStyleSheet("""
-            QFrame {
-                background: white;
-                border-bottom: 1px solid #E2E8F0;
-            }
-        """)
+        button_container.setObjectName("roleBar")
         button_layout = QHBoxLayout(button_container)
         button_layout.setContentsMargins(20, 12, 20, 12)
         button_layout.setSpacing(15)
 
-        self.teacher_btn = self.create_role_button(" Teacher", "#4299E1")
-        self.student_btn = self.create_role_button(" Deaf Student", "#48BB78") 
-        self.mute_student_btn = self.create_role_button(" Mute Student", "#ED8936")
-        self.ai_assistant_btn = self.create_role_button(" AI Assistant", "#9F7AEA")  # New AI Assistant button
+        self.teacher_btn = self.create_role_button(" Teacher", "teacherBtn")
+        self.student_btn = self.create_role_button(" Deaf Student", "studentBtn") 
+        self.mute_student_btn = self.create_role_button(" Mute Student", "muteStudentBtn")
+        self.ai_assistant_btn = self.create_role_button(" AI Assistant", "aiAssistantBtn")  # New AI Assistant button
 
         for btn in [self.teacher_btn, self.student_btn, self.mute_student_btn, self.ai_assistant_btn]:
             button_layout.addWidget(btn)
@@ -617,26 +1009,15 @@ class MainInterface(QWidget):
 
         # Pages container
         self.pages = QStackedWidget()
-        self.pages.setStyleSheet("background: transparent;")
+        self.pages.setObjectName("pages")
         
-        # Initialize pages
-        try:
-            self.teacher_page = TeacherPage()
-            self.student_page = StudentPage()
-            self.mute_student_page = MuteStudentPage()
-            self.ai_assistant_page = AIAssistantPage()  # Now using the speaking AI assistant page
-            
-            self.pages.addWidget(self.teacher_page)
-            self.pages.addWidget(self.student_page)
-            self.pages.addWidget(self.mute_student_page)
-            self.pages.addWidget(self.ai_assistant_page)  # Add AI Assistant page
-        except Exception as e:
-            print(f"Error initializing pages: {e}")
-            # Create fallback pages if imports fail
-            self.pages.addWidget(QLabel("Teacher Page - Module not found"))
-            self.pages.addWidget(QLabel("Deaf Student Page - Module not found"))
-            self.pages.addWidget(QLabel("Mute Student Page - Module not found"))
-            self.pages.addWidget(QLabel("AI Assistant Page - Module not found"))
+        # Placeholder pages; the real ones pull in audio, camera and ML stacks,
+        # so each is only built when its tab is first selected
+        self._page_instances = {}
+        for index in _PAGES:
+            loading_label = QLabel("Loading...")
+            loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.pages.addWidget(loading_label)
         
         left_layout.addWidget(self.pages)
 
@@ -652,26 +1033,15 @@ class MainInterface(QWidget):
         self.setLayout(main_layout)
         self.current_page_index = 0
 
-    def create_role_button(self, text, color):
+    def create_role_button(self, text, name):
         """Create styled role selection buttons"""
         button = QPushButton(text)
-        button.setFont(QFont("Segoe UI", 13, QFont.Weight.Medium))
+        button.setFont(_font(13, QFont.Weight.Medium))
         button.setMinimumHeight(45)
         button.setCursor(Qt.CursorShape.PointingHandCursor)
-        button.setStyleSheet(f"""
-            QPushButton {{
-                background: white;
-                color: #4A5568;
-                border: 2px solid #E2E8F0;
-                border-radius: 10px;
-                padding: 10px 20px;
-            }}
-            QPushButton:hover {{
-                background: {color};
-                color: white;
-                border-color: {color};
-            }}
-        """)
+        button.setObjectName(name)
+        button.setProperty("role", True)
+        button.setProperty("active", False)
         return button
 
     def setup_connections(self):
@@ -689,42 +1059,41 @@ class MainInterface(QWidget):
         self.pages.setCurrentIndex(index)
         self.current_page_index = index
         
-        # Update button styles
-        buttons = [self.teacher_btn, self.student_btn, self.mute_student_btn, self.ai_assistant_btn]
-        active_colors = ["#4299E1", "#48BB78", "#ED8936", "#9F7AEA"]
+        if index not in self._page_instances:
+            # Let the "Loading..." placeholder paint before the page is built
+            QTimer.singleShot(0, lambda: self.load_page(index))
         
+        # Update button styles - APP_QSS keys off the "active" property, so the
+        # style only needs re-polishing, not a new stylesheet
+        buttons = [self.teacher_btn, self.student_btn, self.mute_student_btn, self.ai_assistant_btn]
         for i, btn in enumerate(buttons):
-            if i == index:
-                # Active button
-                btn.setStyleSheet(f"""
-                    QPushButton {{
-                        background: {active_colors[i]};
-                        color: white;
-                        border: 2px solid {active_colors[i]};
-                        border-radius: 10px;
-                        padding: 10px 20px;
-                    }}
-                """)
-            else:
-                # Inactive button
-                btn.setStyleSheet(f"""
-                    QPushButton {{
-                        background: white;
-                        color: #4A5568;
-                        border: 2px solid #E2E8F0;
-                        border-radius: 10px;
-                        padding: 10px 20px;
-                    }}
-                    QPushButton:hover {{
-                        background: {active_colors[i]};
-                        color: white;
-                        border-color: {active_colors[i]};
-                    }}
-                """)
+            btn.setProperty("active", i == index)
+            btn.style().unpolish(btn)
+            btn.style().polish(btn)
         
         # Show/hide AI Assistant based on page
         self.update_assistant_visibility()
 
+    def load_page(self, index):
+        """Build a role page the first time its tab is opened"""
+        if index in self._page_instances:
+            return
+        
+        module_name, class_name, title = _PAGES[index]
+        try:
+            page = getattr(importlib.import_module(module_name), class_name)()
+        except Exception as e:
+            print(f"Error initializing {title}: {e}")
+            # Fallback page if the import or construction fails
+            page = QLabel(f"{title} - Module not found")
+        
+        self._page_instances[index] = page
+        placeholder = self.pages.widget(index)
+        self.pages.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.pages.insertWidget(index, page)
+        self.pages.setCurrentIndex(self.current_page_index)
+
     def update_assistant_visibility(self):
         """Show AI Assistant toggle for student pages, hide for teacher and AI Assistant page"""
         if self.current_page_index in [1, 2]:  # Student pages
@@ -761,15 +1130,18 @@ if __name__ == "__main__":
     
     # Set application-wide font and style
     app.setFont(QFont("Segoe UI", 10))
-    app.setStyleSheet("""
-        QWidget {
-            font-family: "Segoe UI";
-        }
-    """)
+    app.setStyleSheet(APP_QSS)
     
     try:
         window = MainInterface()
         window.show()
+        if qasync is not None:
+            # Run Qt inside an asyncio loop so the assistant can await Gemini
+            loop = qasync.QEventLoop(app)
+            asyncio.set_event_loop(loop)
+            with loop:
+                loop.run_forever()
+            sys.exit(0)
         sys.exit(app.exec())
     except Exception as e:
         print(f"Application error: {e}")
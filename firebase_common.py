@@ -0,0 +1,30 @@
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Helpers shared by the pages that talk to the Firebase Realtime Database
+
+def create_session(pool_maxsize=10):
+    """Create a requests session with proper retry strategy"""
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def chat_list(chat_messages):
+    """Normalize Firebase chat data (legacy list or push-ID dict) to a list"""
+    # Push IDs sort chronologically; (len, key) also orders the numeric
+    # keys of sessions written before chat became a push-list
+    if isinstance(chat_messages, dict):
+        return [chat_messages[key] for key in sorted(chat_messages, key=lambda k: (len(k), k))]
+    return list(chat_messages or [])
+
+# Session codes are exactly six ASCII digits (str.isdigit also takes "²" or "٣")
+SESSION_CODE_RE = re.compile(r"[0-9]{6}")
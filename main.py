@@ -1,9 +1,23 @@
 import sys
+import asyncio
+import logging
 from PyQt6.QtWidgets import QApplication
-from app_window import MainInterface  # import the main window class
+from PyQt6.QtGui import QFont
+from app_window import MainInterface, APP_QSS, qasync  # import the main window class
 
 if __name__ == "__main__":
+    # Hot-path debug logging stays off unless turned up here
+    logging.basicConfig(level=logging.WARNING)
     app = QApplication(sys.argv)
+    app.setFont(QFont("Segoe UI", 10))
+    app.setStyleSheet(APP_QSS)
     window = MainInterface()
     window.show()
+    if qasync is not None:
+        # Run Qt inside an asyncio loop so the assistant can await Gemini
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        with loop:
+            loop.run_forever()
+        sys.exit(0)
     sys.exit(app.exec())
@@ -10,14 +10,17 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from firebase_common import create_session, chat_list, SESSION_CODE_RE
 
 # ----------------------------
 # Firebase Base URL
 # ----------------------------
 FIREBASE_URL = "https://include-6e31e-default-rtdb.firebaseio.com/"
 
+# Shared keep-alive pool: joins, chat sends and the listener reuse open
+# TLS connections instead of handshaking on every call
+HTTP_SESSION = create_session()
+
 # ==========================================================
 # Optimized Standalone MediaPipe Script
 # ==========================================================
@@ -197,63 +200,47 @@ class FirebaseListener(QThread):
         self.last_chat_count = 0
         self.last_transcript = ""
         
-        # Enhanced session configuration
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=10)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        self.session = HTTP_SESSION
         
     def run(self):
         while self.running:
             try:
-                # Test connection first
-                response = self.session.get(f"{FIREBASE_URL}/.json", timeout=10)
-                if response.status_code == 200:
+                # The sessions request doubles as the connectivity check
+                sessions_response = self.session.get(f"{FIREBASE_URL}/sessions.json", timeout=10)
+                if sessions_response.status_code == 200:
                     self.connection_status.emit(True)
+                    sessions = sessions_response.json() or {}
+                    session_found = False
+                    
+                    for session_id, session_data in sessions.items():
+                        if session_data and session_data.get("session_code") == self.session_code:
+                            self.session_id = session_id
+                            session_found = True
+                            self.session_verified.emit(True)
+                            
+                            # Check for chat updates
+                            chat_messages = chat_list(session_data.get("chat_messages"))
+                            current_chat_count = len(chat_messages)
+                            
+                            if current_chat_count > self.last_chat_count:
+                                new_messages = chat_messages[self.last_chat_count:]
+                                for message in new_messages:
+                                    if message and message.get("sender") == "teacher":
+                                        self.new_chat_message.emit(message)
+                                self.last_chat_count = current_chat_count
+                            
+                            # Check for student transcript updates
+                            current_transcript = session_data.get("student_transcript", "")
+                            if current_transcript != self.last_transcript:
+                                self.last_transcript = current_transcript
+                                if current_transcript:
+                                    self.new_student_transcript.emit(current_transcript)
+                            break
                     
-                    # Now search for the session
-                    sessions_response = self.session.get(f"{FIREBASE_URL}/sessions.json", timeout=10)
-                    if sessions_response.status_code == 200:
-                        sessions = sessions_response.json() or {}
-                        session_found = False
-                        
-                        for session_id, session_data in sessions.items():
-                            if session_data and session_data.get("session_code") == self.session_code:
-                                self.session_id = session_id
-                                session_found = True
-                                self.session_verified.emit(True)
-                                
-                                # Check for chat updates
-                                chat_messages = session_data.get("chat_messages", [])
-                                current_chat_count = len(chat_messages)
-                                
-                                if current_chat_count > self.last_chat_count:
-                                    new_messages = chat_messages[self.last_chat_count:]
-                                    for message in new_messages:
-                                        if message and message.get("sender") == "teacher":
-                                            self.new_chat_message.emit(message)
-                                    self.last_chat_count = current_chat_count
-                                
-                                # Check for student transcript updates
-                                current_transcript = session_data.get("student_transcript", "")
-                                if current_transcript != self.last_transcript:
-                                    self.last_transcript = current_transcript
-                                    if current_transcript:
-                                        self.new_student_transcript.emit(current_transcript)
-                                break
-                        
-                        if not session_found:
-                            self.session_verified.emit(False)
-                    else:
-                        print(f"❌ Failed to fetch sessions: {sessions_response.status_code}")
-                        self.connection_status.emit(False)
+                    if not session_found:
+                        self.session_verified.emit(False)
                 else:
-                    print(f"❌ Firebase connection failed: {response.status_code}")
+                    print(f"❌ Failed to fetch sessions: {sessions_response.status_code}")
                     self.connection_status.emit(False)
                     
             except requests.exceptions.Timeout:
@@ -279,12 +266,19 @@ class MuteStudentPage(QWidget):
         super().__init__()
         self.session_code = None
         self.student_name = None
+        self.session_id = None
         self.firebase_listener = None
         self.is_leaving = False
         self.mediapipe_process = None
         self.mediapipe_running = False
         self.mediapipe_monitor_timer = None
         
+        # At most one scroll-to-bottom (and repaint) per 16 ms frame
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.setInterval(16)
+        self._scroll_timer.timeout.connect(self._scroll_to_bottom)
+        
         self.init_ui()
 
     def init_ui(self):
@@ -833,7 +827,7 @@ class MuteStudentPage(QWidget):
             self.show_error("Please enter a session code")
             return
 
-        if len(code) != 6 or not code.isdigit():
+        if not SESSION_CODE_RE.fullmatch(code):
             self.show_error("Please enter a valid 6-digit code")
             return
 
@@ -854,15 +848,9 @@ class MuteStudentPage(QWidget):
 
     def _check_session_async(self):
         try:
-            # Test Firebase connection first
-            session = requests.Session()
-            test_response = session.get(f"{FIREBASE_URL}/.json", timeout=10)
-            
-            if test_response.status_code != 200:
-                self.show_error(f"Connection failed (Status: {test_response.status_code}). Please check your internet connection.")
-                return
-
-            # Now search for the session
+            # No separate /.json probe: it downloads the whole database, and
+            # this request's Timeout/ConnectionError already says we're offline
+            session = HTTP_SESSION
             response = session.get(f"{FIREBASE_URL}/sessions.json", timeout=10)
             if response.status_code == 200:
                 data = response.json() or {}
@@ -883,6 +871,8 @@ class MuteStudentPage(QWidget):
                         )
                         if patch_response.status_code == 200:
                             print(f"✅ Student name '{self.student_name}' saved to session")
+                            # Chat sends address this session directly
+                            self.session_id = session_id
                             self.setup_live_session()
                         else:
                             self.show_error(f"Failed to join session (Error: {patch_response.status_code})")
@@ -1033,40 +1023,24 @@ class MuteStudentPage(QWidget):
 
     def _send_chat_async(self, message):
         """Fixed chat sending with proper error handling"""
+        if self.session_id is None:
+            return
         try:
-            session = requests.Session()
-            session.mount('http://', HTTPAdapter(max_retries=2))
-            session.mount('https://', HTTPAdapter(max_retries=2))
+            chat_data = {
+                "sender": "student",
+                "message": message,
+                "timestamp": int(time.time())
+            }
             
-            response = session.get(f"{FIREBASE_URL}/sessions.json", timeout=5)
-            if response.status_code == 200:
-                sessions = response.json() or {}
-                
-                for session_id, session_data in sessions.items():
-                    if session_data and session_data.get("session_code") == self.session_code:
-                        existing_chat = session_data.get("chat_messages", [])
-                        
-                        chat_data = {
-                            "sender": "student",
-                            "message": message,
-                            "timestamp": int(time.time())
-                        }
-                        existing_chat.append(chat_data)
-                        
-                        update_data = {
-                            "chat_messages": existing_chat,
-                            "last_updated": int(time.time())
-                        }
-                        
-                        patch_response = session.patch(
-                            f"{FIREBASE_URL}/sessions/{session_id}.json", 
-                            json=update_data, 
-                            timeout=3
-                        )
-                        
-                        if patch_response.status_code == 200:
-                            print(f"✅ Chat message sent: {message}")
-                        break
+            # POST appends a push-ID child instead of rewriting the list
+            post_response = HTTP_SESSION.post(
+                f"{FIREBASE_URL}/sessions/{self.session_id}/chat_messages.json",
+                json=chat_data,
+                timeout=3
+            )
+            
+            if post_response.status_code == 200:
+                print(f"✅ Chat message sent: {message}")
                     
         except Exception as e:
             print(f"Chat send error: {e}")
@@ -1090,6 +1064,10 @@ class MuteStudentPage(QWidget):
         self.transcript_display.setText(transcript)
 
     def scroll_chat_to_bottom(self):
+        """Request a scroll to the newest message; bursts share one scroll"""
+        self._scroll_timer.start()
+
+    def _scroll_to_bottom(self):
         scrollbar = self.chat_display.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
 
@@ -1187,6 +1165,7 @@ class MuteStudentPage(QWidget):
         # Clear session data
         self.session_code = None
         self.student_name = None
+        self.session_id = None
         
         # Hide session screen, show join screen
         self.session_screen.hide()
@@ -2,26 +2,39 @@ import queue
 import sounddevice as sd
 import whisper  # Changed from vosk import
 import numpy as np
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, 
                             QLineEdit, QMessageBox, QStackedWidget, QTextEdit, QScrollArea,
                             QFrame)
 from PyQt6.QtGui import QFont, QPalette, QColor
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
-import json, random, requests, time
+from PyQt6.QtCore import Qt, QTimer, QThread, QObject, QUrl, QUrlQuery, pyqtSignal
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+import json, requests, time, secrets, re
 import win32com.client
-import urllib3
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from firebase_common import chat_list
 import threading
+import logging
 
 FIREBASE_URL = "https://include-6e31e-default-rtdb.firebaseio.com/"
+SERVER_TIMESTAMP = {".sv": "timestamp"}
 
-# Disable SSL warnings and configure for better connectivity
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Hot paths (listener loop, Whisper, Firebase writes) log instead of print:
+# disabled levels cost nothing and never take the stdout lock
+log = logging.getLogger(__name__)
 
 # Whisper Model - Initialize empty, will load later
 whisper_model = None
-audio_queue = queue.Queue()
+
+# Whisper output noise: spaced-out ellipses, runs of dots, repeated whitespace
+_CLEAN_RE = re.compile(r'(?: \.){3}|\.{2,}|\s{2,}')
+
+def _clean_repl(match):
+    """Replacement for a _CLEAN_RE match: whitespace -> " ", ".." -> ".", ellipsis -> "..." """
+    s = match.group(0)
+    if not s.endswith("."):
+        return " "
+    return "." if s == ".." else "..."
 
 # ==========================================================
 # High-Performance Text-to-Speech Engine using win32com
@@ -104,8 +117,7 @@ class StudentTranscriptListener(QThread):
             try:
                 response = session.get(
                     f"{FIREBASE_URL}/sessions/{self.session_id}.json",
-                    timeout=10,
-                    verify=False
+                    timeout=10
                 )
                 if response.status_code == 200:
                     self.connection_status.emit(True)
@@ -124,7 +136,7 @@ class StudentTranscriptListener(QThread):
                         self.new_transcript.emit(student_transcript)
                     
                     # Check for chat updates
-                    chat_messages = session_data.get("chat_messages", [])
+                    chat_messages = chat_list(session_data.get("chat_messages"))
                     current_chat_count = len(chat_messages)
                     
                     if current_chat_count > self.last_chat_count:
@@ -144,7 +156,7 @@ class StudentTranscriptListener(QThread):
                     self.connection_status.emit(False)
                     
             except Exception as e:
-                print(f"Firebase listener: {e}")
+                log.debug("Firebase listener: %s", e)
                 self.connection_status.emit(False)
             
             QThread.msleep(300)
@@ -152,38 +164,184 @@ class StudentTranscriptListener(QThread):
     def stop(self):
         self.running = False
 
+# ==========================================================
+# Coalescing Firebase Session Writer
+# ==========================================================
+class FirebaseBatchWriter(QObject):
+    """Collects field updates for one session and sends them as a single PATCH"""
+    
+    def __init__(self, session_id, interval=100, parent=None):
+        super().__init__(parent)
+        self.url = QUrl(f"{FIREBASE_URL}/sessions/{session_id}.json")
+        self._pending = {}
+        self._nam = QNetworkAccessManager(self)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+    
+    def update(self, field, value):
+        """Queue a field write; later values for the same field replace earlier ones"""
+        self._pending[field] = value
+        if not self._timer.isActive():
+            self._timer.start()
+    
+    def flush(self):
+        """Send everything queued so far (non-blocking)"""
+        self._timer.stop()
+        if not self._pending:
+            return
+        body = json.dumps(self._pending).encode()
+        self._pending = {}
+        
+        request = QNetworkRequest(self.url)
+        request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
+        request.setTransferTimeout(5000)
+        reply = self._nam.sendCustomRequest(request, b"PATCH", body)
+        reply.finished.connect(lambda: self._on_finished(reply))
+    
+    def clear(self):
+        """Drop queued writes (e.g. when the session is being deleted)"""
+        self._timer.stop()
+        self._pending = {}
+    
+    def _on_finished(self, reply):
+        if reply.error() != reply.NetworkError.NoError:
+            log.warning("Firebase write error: %s", reply.errorString())
+        reply.deleteLater()
+
 # ==========================================================
 # Flutter-Style Session Creation Page
 # ==========================================================
+SESSION_CREATION_QSS = """
+    QWidget#sessionCreationPage {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+            stop:0 #E3F2FD, stop:1 #BBDEFB);
+    }
+    QWidget#sessionAppBar, QPushButton#createSessionBtn {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #2196F3, stop:1 #1976D2);
+        border: none;
+    }
+    QLabel#appBarTitle {
+        color: white;
+        margin-left: 10px;
+    }
+    QWidget#sessionCard {
+        background: white;
+        border-radius: 20px;
+        border: none;
+    }
+    QLabel#sessionTitle, QLabel#successTitle {
+        color: #1976D2;
+        margin-bottom: 8px;
+    }
+    QLabel#sessionSubtitle {
+        color: #757575;
+        margin-bottom: 40px;
+        line-height: 1.4;
+    }
+    QLabel#successSubtitle {
+        color: #757575;
+        margin-bottom: 30px;
+    }
+    QLabel#sessionNameLabel {
+        color: #424242;
+    }
+    QLineEdit#sessionInput {
+        background-color: #FAFAFA;
+        color: #212121;
+        padding: 16px 20px;
+        border-radius: 12px;
+        border: 2px solid #E0E0E0;
+        font-size: 14px;
+    }
+    QLineEdit#sessionInput:focus {
+        border-color: #2196F3;
+        background-color: #FFFFFF;
+    }
+    QPushButton#createSessionBtn, QPushButton#continueBtn {
+        color: white;
+        border: none;
+        border-radius: 12px;
+        font-weight: bold;
+    }
+    QPushButton#createSessionBtn:hover {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #1976D2, stop:1 #1565C0);
+    }
+    QPushButton#createSessionBtn:pressed {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #1565C0, stop:1 #0D47A1);
+    }
+    QPushButton#createSessionBtn:disabled {
+        background: #BDBDBD;
+        color: #9E9E9E;
+    }
+    QLabel#sessionStatus {
+        color: #757575;
+        padding: 16px;
+        background-color: #F5F5F5;
+        border-radius: 12px;
+        border: 1px solid #EEEEEE;
+        line-height: 1.4;
+    }
+    QLabel#sessionStatus[state="busy"] {
+        color: #F57C00;
+        background-color: #FFF3E0;
+        border: 1px solid #FFB74D;
+    }
+    QLabel#sessionStatus[state="error"] {
+        color: #D32F2F;
+        background-color: #FFEBEE;
+        border: 1px solid #FFCDD2;
+    }
+    QWidget#codeCard {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #E8F5E8, stop:1 #C8E6C9);
+        border-radius: 16px;
+        border: 2px solid #4CAF50;
+    }
+    QLabel#codeTitle {
+        color: #2E7D32;
+        margin-bottom: 8px;
+    }
+    QLabel#sessionCode {
+        color: #1B5E20;
+        letter-spacing: 8px;
+        margin: 12px 0;
+    }
+    QLabel#codeHint {
+        color: #4CAF50;
+        margin-top: 8px;
+    }
+    QPushButton#continueBtn {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #4CAF50, stop:1 #43A047);
+    }
+    QPushButton#continueBtn:hover {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #43A047, stop:1 #388E3C);
+    }
+    QPushButton#continueBtn:pressed {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #388E3C, stop:1 #2E7D32);
+    }
+"""
+
 class SessionCreationPage(QWidget):
     session_created = pyqtSignal(str, str)  # session_id, session_code
     
     def __init__(self):
         super().__init__()
-        self.session = self._create_session()
+        self._nam = QNetworkAccessManager(self)
         self.init_ui()
 
-    def _create_session(self):
-        """Create a requests session with proper retry strategy"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=10)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
-
     def init_ui(self):
-        # Main layout with Flutter-style background
-        self.setStyleSheet("""
-            QWidget {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #E3F2FD, stop:1 #BBDEFB);
-            }
-        """)
+        # One page-level stylesheet, parsed once; widgets pick their rules up
+        # by objectName instead of each carrying its own sheet
+        self.setObjectName("sessionCreationPage")
+        self.setStyleSheet(SESSION_CREATION_QSS)
         
         # Main layout
         main_layout = QVBoxLayout()
@@ -192,254 +350,132 @@ class SessionCreationPage(QWidget):
         
         # App Bar
         app_bar = QWidget()
+        app_bar.setObjectName("sessionAppBar")
         app_bar.setFixedHeight(80)
-        app_bar.setStyleSheet("""
-            QWidget {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #2196F3, stop:1 #1976D2);
-                border: none;
-            }
-        """)
         app_bar_layout = QHBoxLayout(app_bar)
         app_bar_layout.setContentsMargins(30, 15, 30, 15)
         
         # App title
-        title_layout = QHBoxLayout()
         title_icon = QLabel("🎓")
         title_icon.setFont(QFont("Segoe UI", 24))
         title_text = QLabel("Include")
+        title_text.setObjectName("appBarTitle")
         title_text.setFont(QFont("Segoe UI", 22, QFont.Weight.Bold))
-        title_text.setStyleSheet("color: white; margin-left: 10px;")
-        title_layout.addWidget(title_icon)
-        title_layout.addWidget(title_text)
-        app_bar_layout.addLayout(title_layout)
+        app_bar_layout.addWidget(title_icon)
+        app_bar_layout.addWidget(title_text)
         app_bar_layout.addStretch()
         
         main_layout.addWidget(app_bar)
 
-        # Content area
-        content_widget = QWidget()
-        content_widget.setStyleSheet("background: transparent;")
-        content_layout = QVBoxLayout(content_widget)
-        content_layout.setContentsMargins(30, 40, 30, 40)
-        content_layout.setSpacing(0)
-
-        # Centered card
+        # Centered card - one grid, one widget per row. Form and success rows
+        # share the grid; hidden rows take no space.
         card = QWidget()
+        card.setObjectName("sessionCard")
         card.setMaximumWidth(500)
-        card.setStyleSheet("""
-            QWidget {
-                background: white;
-                border-radius: 20px;
-                border: none;
-            }
-        """)
-        card_layout = QVBoxLayout(card)
+        card_layout = QGridLayout(card)
         card_layout.setContentsMargins(40, 40, 40, 40)
-        card_layout.setSpacing(0)
-
-        # Header
-        header_layout = QVBoxLayout()
-        header_layout.setSpacing(20)
-        header_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        card_layout.setVerticalSpacing(20)
 
         icon_label = QLabel("🚀")
         icon_label.setFont(QFont("Segoe UI", 48))
         icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        header_layout.addWidget(icon_label)
+        card_layout.addWidget(icon_label, 0, 0)
 
         title_label = QLabel("Create New Session")
+        title_label.setObjectName("sessionTitle")
         title_label.setFont(QFont("Segoe UI", 24, QFont.Weight.Bold))
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("color: #1976D2; margin-bottom: 8px;")
-        header_layout.addWidget(title_label)
+        card_layout.addWidget(title_label, 1, 0)
 
         subtitle_label = QLabel("Start an inclusive learning session with your student")
+        subtitle_label.setObjectName("sessionSubtitle")
         subtitle_label.setFont(QFont("Segoe UI", 14))
         subtitle_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subtitle_label.setStyleSheet("color: #757575; margin-bottom: 40px; line-height: 1.4;")
         subtitle_label.setWordWrap(True)
-        header_layout.addWidget(subtitle_label)
-
-        card_layout.addLayout(header_layout)
-
-        # Form section
-        form_layout = QVBoxLayout()
-        form_layout.setSpacing(25)
-
-        # Input field
-        input_container = QVBoxLayout()
-        input_container.setSpacing(8)
+        card_layout.addWidget(subtitle_label, 2, 0)
 
+        # Form rows
         name_label = QLabel("Session Name")
+        name_label.setObjectName("sessionNameLabel")
         name_label.setFont(QFont("Segoe UI", 12, QFont.Weight.Medium))
-        name_label.setStyleSheet("color: #424242;")
-        input_container.addWidget(name_label)
+        card_layout.addWidget(name_label, 3, 0)
 
         self.session_input = QLineEdit()
+        self.session_input.setObjectName("sessionInput")
         self.session_input.setPlaceholderText("Enter a name for your session...")
         self.session_input.setFont(QFont("Segoe UI", 13))
         self.session_input.setMinimumHeight(52)
-        self.session_input.setStyleSheet("""
-            QLineEdit {
-                background-color: #FAFAFA;
-                color: #212121;
-                padding: 16px 20px;
-                border-radius: 12px;
-                border: 2px solid #E0E0E0;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border-color: #2196F3;
-                background-color: #FFFFFF;
-            }
-            QLineEdit::placeholder {
-                color: #9E9E9E;
-            }
-        """)
-        input_container.addWidget(self.session_input)
-        form_layout.addLayout(input_container)
+        card_layout.addWidget(self.session_input, 4, 0)
 
-        # Create button
         self.create_button = QPushButton("Create Session")
+        self.create_button.setObjectName("createSessionBtn")
         self.create_button.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
         self.create_button.setMinimumHeight(54)
         self.create_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.create_button.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #2196F3, stop:1 #1976D2);
-                color: white;
-                border: none;
-                border-radius: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #1976D2, stop:1 #1565C0);
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #1565C0, stop:1 #0D47A1);
-            }
-            QPushButton:disabled {
-                background: #BDBDBD;
-                color: #9E9E9E;
-            }
-        """)
         self.create_button.clicked.connect(self.create_session)
-        form_layout.addWidget(self.create_button)
-
-        card_layout.addLayout(form_layout)
-        card_layout.addSpacing(30)
+        card_layout.addWidget(self.create_button, 5, 0)
 
-        # Status area
         self.status_label = QLabel("Ready to create your session")
+        self.status_label.setObjectName("sessionStatus")
         self.status_label.setFont(QFont("Segoe UI", 12))
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.status_label.setStyleSheet("""
-            color: #757575;
-            padding: 16px;
-            background-color: #F5F5F5;
-            border-radius: 12px;
-            border: 1px solid #EEEEEE;
-            line-height: 1.4;
-        """)
         self.status_label.setWordWrap(True)
-        card_layout.addWidget(self.status_label)
-
-        # Success section (initially hidden)
-        self.success_widget = QWidget()
-        self.success_widget.setStyleSheet("background: transparent;")
-        success_layout = QVBoxLayout(self.success_widget)
-        success_layout.setSpacing(25)
-        success_layout.setContentsMargins(0, 0, 0, 0)
+        card_layout.addWidget(self.status_label, 6, 0)
 
+        # Success rows (initially hidden)
         success_icon = QLabel("✅")
         success_icon.setFont(QFont("Segoe UI", 48))
         success_icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        success_layout.addWidget(success_icon)
 
         success_title = QLabel("Session Created!")
+        success_title.setObjectName("successTitle")
         success_title.setFont(QFont("Segoe UI", 22, QFont.Weight.Bold))
         success_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        success_title.setStyleSheet("color: #1976D2; margin-bottom: 8px;")
-        success_layout.addWidget(success_title)
 
         success_subtitle = QLabel("Share this code with your student to begin")
+        success_subtitle.setObjectName("successSubtitle")
         success_subtitle.setFont(QFont("Segoe UI", 14))
         success_subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        success_subtitle.setStyleSheet("color: #757575; margin-bottom: 30px;")
-        success_layout.addWidget(success_subtitle)
 
-        # Code display
+        # Code display - the bordered box is the one nested container left
         code_card = QWidget()
-        code_card.setStyleSheet("""
-            QWidget {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #E8F5E8, stop:1 #C8E6C9);
-                border-radius: 16px;
-                border: 2px solid #4CAF50;
-            }
-        """)
+        code_card.setObjectName("codeCard")
         code_layout = QVBoxLayout(code_card)
         code_layout.setContentsMargins(30, 25, 30, 25)
 
         code_title = QLabel("Session Code")
+        code_title.setObjectName("codeTitle")
         code_title.setFont(QFont("Segoe UI", 12, QFont.Weight.Medium))
         code_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        code_title.setStyleSheet("color: #2E7D32; margin-bottom: 8px;")
         code_layout.addWidget(code_title)
 
         self.session_code_label = QLabel("")
+        self.session_code_label.setObjectName("sessionCode")
         self.session_code_label.setFont(QFont("Segoe UI", 32, QFont.Weight.Bold))
         self.session_code_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.session_code_label.setStyleSheet("""
-            color: #1B5E20;
-            letter-spacing: 8px;
-            margin: 12px 0;
-        """)
         code_layout.addWidget(self.session_code_label)
 
         code_hint = QLabel("Your student will use this 6-digit code to join")
+        code_hint.setObjectName("codeHint")
         code_hint.setFont(QFont("Segoe UI", 11))
         code_hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        code_hint.setStyleSheet("color: #4CAF50; margin-top: 8px;")
         code_layout.addWidget(code_hint)
 
-        success_layout.addWidget(code_card)
-
-        # Continue button
         self.continue_button = QPushButton("Enter Classroom")
+        self.continue_button.setObjectName("continueBtn")
         self.continue_button.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
         self.continue_button.setMinimumHeight(54)
         self.continue_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.continue_button.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #4CAF50, stop:1 #43A047);
-                color: white;
-                border: none;
-                border-radius: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #43A047, stop:1 #388E3C);
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #388E3C, stop:1 #2E7D32);
-            }
-        """)
         self.continue_button.clicked.connect(self.continue_to_session)
-        success_layout.addWidget(self.continue_button)
 
-        card_layout.addWidget(self.success_widget)
-        self.success_widget.hide()
+        self.success_rows = [success_icon, success_title, success_subtitle, code_card, self.continue_button]
+        for row, widget in enumerate(self.success_rows, start=7):
+            card_layout.addWidget(widget, row, 0)
+            widget.hide()
 
-        content_layout.addWidget(card, alignment=Qt.AlignmentFlag.AlignCenter)
-        main_layout.addWidget(content_widget)
+        main_layout.addStretch()
+        main_layout.addWidget(card, alignment=Qt.AlignmentFlag.AlignCenter)
+        main_layout.addStretch()
 
         self.setLayout(main_layout)
 
@@ -454,51 +490,81 @@ class SessionCreationPage(QWidget):
         self.create_button.setText("Creating...")
         self.session_input.setEnabled(False)
         
-        self.status_label.setText("Setting up your virtual classroom...")
-        self.status_label.setStyleSheet("""
-            color: #F57C00;
-            padding: 16px;
-            background-color: #FFF3E0;
-            border-radius: 12px;
-            border: 1px solid #FFB74D;
-        """)
-
-        # Generate session code and create in Firebase
-        session_code = str(random.randint(100000, 999999))
-        session_id = self.push_to_firebase(session_name, session_code)
+        self._set_status("Setting up your virtual classroom...", "busy")
+
+        # Generate session code and create in Firebase - replies arrive on
+        # the event loop, so the window stays responsive meanwhile
+        self._claim_session_code(session_name)
+
+    def _claim_session_code(self, session_name, attempts_left=5):
+        """Pick a random 6-digit code and make sure no session uses it yet"""
+        session_code = f"{secrets.randbelow(900000) + 100000:06d}"
+        query = QUrlQuery()
+        query.addQueryItem("orderBy", '"session_code"')
+        query.addQueryItem("equalTo", json.dumps(session_code))
+        url = QUrl(f"{FIREBASE_URL}/sessions.json")
+        url.setQuery(query)
+        
+        request = QNetworkRequest(url)
+        request.setTransferTimeout(10000)
+        reply = self._nam.get(request)
+        reply.finished.connect(
+            lambda: self._on_code_checked(reply, session_name, session_code, attempts_left))
+
+    def _on_code_checked(self, reply, session_name, session_code, attempts_left):
+        """Create the session, or draw a new code if this one is taken"""
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        body = bytes(reply.readAll())
+        reply.deleteLater()
         
-        if session_id:
-            self.session_id = session_id
-            self.session_code = session_code
-            
-            # Hide form elements and show success state
-            self.session_input.hide()
-            self.create_button.hide()
-            self.status_label.hide()
-            
-            # Show session code
-            self.session_code_label.setText(session_code)
-            self.success_widget.show()
-            
+        try:
+            taken = status == 200 and bool(json.loads(body))
+        except ValueError:
+            taken = False
+        
+        if taken and attempts_left > 1:
+            log.debug("Session code %s already in use, picking another", session_code)
+            self._claim_session_code(session_name, attempts_left - 1)
         else:
-            self.show_error("Unable to create session. Please check your connection and try again.")
-            self.create_button.setEnabled(True)
-            self.create_button.setText("Create Session")
-            self.session_input.setEnabled(True)
+            # Unchecked (no index, network trouble) codes still go ahead -
+            # push_to_firebase reports real failures
+            self.push_to_firebase(session_name, session_code)
+
+    def _on_session_created(self, session_id, session_code):
+        """Show the session code once Firebase has stored the session"""
+        self.session_id = session_id
+        self.session_code = session_code
+        
+        # Hide form elements and show success state
+        self.session_input.hide()
+        self.create_button.hide()
+        self.status_label.hide()
+        
+        # Show session code
+        self.session_code_label.setText(session_code)
+        for widget in self.success_rows:
+            widget.show()
+
+    def _on_session_failed(self):
+        """Re-enable the form after all attempts failed"""
+        self.show_error("Unable to create session. Please check your connection and try again.")
+        self.create_button.setEnabled(True)
+        self.create_button.setText("Create Session")
+        self.session_input.setEnabled(True)
 
     def show_error(self, message):
         """Show error message with proper styling"""
-        self.status_label.setText(f"⚠️ {message}")
-        self.status_label.setStyleSheet("""
-            color: #D32F2F;
-            padding: 16px;
-            background-color: #FFEBEE;
-            border-radius: 12px;
-            border: 1px solid #FFCDD2;
-        """)
+        self._set_status(f"⚠️ {message}", "error")
+
+    def _set_status(self, text, state):
+        """Update the status label; its look follows the "state" property"""
+        self.status_label.setText(text)
+        self.status_label.setProperty("state", state)
+        self.status_label.style().unpolish(self.status_label)
+        self.status_label.style().polish(self.status_label)
 
-    def push_to_firebase(self, session_name, session_code):
-        """Push session data to Firebase with improved error handling"""
+    def push_to_firebase(self, session_name, session_code, attempt=0):
+        """Post session data to Firebase without blocking the UI"""
         data = {
             "session_code": session_code,
             "session_name": session_name,
@@ -506,43 +572,42 @@ class SessionCreationPage(QWidget):
             "current_transcript": "",
             "student_transcript": "Student has not started signing yet...",
             "student_name": "Waiting for student...",
-            "chat_messages": [],
-            "created_at": time.time(),
-            "last_updated": time.time()
+            # Filled in by Firebase on write (ms since epoch)
+            "created_at": SERVER_TIMESTAMP,
+            "last_updated": SERVER_TIMESTAMP
         }
         
+        request = QNetworkRequest(QUrl(f"{FIREBASE_URL}/sessions.json"))
+        request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
+        request.setTransferTimeout(10000)
+        
+        reply = self._nam.post(request, json.dumps(data).encode())
+        reply.finished.connect(
+            lambda: self._on_push_finished(reply, session_name, session_code, attempt))
+
+    def _on_push_finished(self, reply, session_name, session_code, attempt):
+        """Handle the Firebase reply; retry up to three attempts in total"""
         max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = self.session.post(
-                    f"{FIREBASE_URL}/sessions.json", 
-                    json=data,
-                    timeout=10,
-                    verify=False
-                )
-                print(f"Firebase response status: {response.status_code}")
-                print(f"Firebase response text: {response.text}")
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    print(f"Session created successfully: {result['name']}")
-                    return result['name']
-                else:
-                    print(f"Firebase error: {response.status_code} - {response.text}")
-                    
-            except requests.exceptions.Timeout:
-                print(f"Attempt {attempt + 1}: Firebase timeout")
-            except requests.exceptions.ConnectionError as e:
-                print(f"Attempt {attempt + 1}: Connection error - {e}")
-            except Exception as e:
-                print(f"Attempt {attempt + 1}: Unexpected error - {e}")
-            
-            # Wait before retrying
-            if attempt < max_retries - 1:
-                time.sleep(1)
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        body = bytes(reply.readAll())
+        error = reply.error()
+        reply.deleteLater()
+        
+        try:
+            if error == reply.NetworkError.NoError and status == 200:
+                session_id = json.loads(body)["name"]
+                log.debug("Session created successfully: %s", session_id)
+                self._on_session_created(session_id, session_code)
+                return
+            log.warning("Attempt %d: Firebase error %s - %s", attempt + 1, status, reply.errorString())
+        except Exception as e:
+            log.warning("Attempt %d: Unexpected error - %s", attempt + 1, e)
         
-        print("All Firebase connection attempts failed")
-        return None
+        if attempt < max_retries - 1:
+            QTimer.singleShot(1000, lambda: self.push_to_firebase(session_name, session_code, attempt + 1))
+        else:
+            log.error("All Firebase connection attempts failed")
+            self._on_session_failed()
 
     def continue_to_session(self):
         self.session_created.emit(self.session_id, self.session_code)
@@ -550,7 +615,10 @@ class SessionCreationPage(QWidget):
 # ==========================================================
 # Whisper STT Processor for Real-time Audio
 # ==========================================================
-class WhisperSTTProcessor:
+class WhisperSTTProcessor(QThread):
+    model_loaded = pyqtSignal(bool, str)
+    transcription_ready = pyqtSignal(str)
+    
     def __init__(self, model_size="medium"):
         """
         Initialize Whisper STT Processor
@@ -558,14 +626,60 @@ class WhisperSTTProcessor:
         model_size: "tiny" (75MB), "base" (142MB), "small" (466MB), 
                    "medium" (1.5GB), "large" (2.9GB)
         """
+        super().__init__()
         self.model_size = model_size
         self.model = None
-        self.audio_buffer = []
+        self.vad = None
+        self.vad_options = None
+        self.min_speech_duration = 0.3
         self.sample_rate = 16000
         self.buffer_duration = 3  # Process every 3 seconds
+        # Preallocated window (3 s plus slack) - incoming chunks are copied in
+        # place, so there are no per-chunk arrays; _wpos is the fill level
+        self._buf = np.empty(self.sample_rate * (self.buffer_duration + 3), dtype=np.float32)
+        self._wpos = 0
+        self._buf_lock = threading.Lock()
         self.last_processing_time = 0
         self.processing_interval = 2  # Minimum seconds between processing
+        # Wake-ups for the inference loop in run(); holds at most one so a
+        # window that fills while Whisper is busy is simply dropped
+        self._work_q = queue.Queue(maxsize=1)
+        self.running = True
+        # Tokens of the last emitted transcription, kept so each new one is split only once
+        self._last_tokens = frozenset()
+    
+    def run(self):
+        """Load the model off the GUI thread, then stay here as the single inference worker"""
         self.load_model()
+        if self.model is None:
+            self.model_loaded.emit(False, "Failed to load Whisper model")
+            return
+        
+        # Warm up on a second of silence (Whisper pads every input to 30 s) so
+        # the first real utterance doesn't pay for kernel/allocator setup
+        try:
+            self.model.transcribe(np.zeros(self.sample_rate, dtype=np.float32),
+                                  language="en", fp16=self.model.device.type == "cuda",
+                                  temperature=0.0, condition_on_previous_text=False)
+        except Exception as e:
+            log.warning("Whisper warm-up failed: %s", e)
+        self.model_loaded.emit(True, f"Whisper {self.model_size} model loaded")
+        
+        while self.running:
+            if self._work_q.get() is None:
+                break
+            text = self.process_buffer()
+            if text:
+                self.transcription_ready.emit(text)
+    
+    def stop(self):
+        """Stop the inference loop"""
+        self.running = False
+        try:
+            self._work_q.put_nowait(None)
+        except queue.Full:
+            # A pending window is queued; the loop sees running=False after it
+            pass
         
     def load_model(self):
         """Load Whisper model"""
@@ -583,72 +697,168 @@ class WhisperSTTProcessor:
             except Exception as e2:
                 print(f"❌ Failed to load any Whisper model: {e2}")
                 self.model = None
+        
+        try:
+            # Silero VAD (ONNX, bundled with faster-whisper) - ~1 ms per window
+            # on CPU, decides whether the window is worth transcribing at all
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+            self.vad = get_speech_timestamps
+            self.vad_options = VadOptions()
+            self.vad(np.zeros(self.sample_rate, dtype=np.float32), self.vad_options)
+        except Exception as e:
+            log.warning("Silero VAD unavailable, transcribing every window: %s", e)
+            self.vad = None
     
     def add_audio_chunk(self, audio_bytes):
-        """Add audio chunk for processing"""
+        """Add int16 PCM for processing and wake the worker once a window is ready - NON-BLOCKING"""
         if self.model is None:
-            return
+            return False
             
-        # Convert bytes to numpy array
-        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        self.audio_buffer.append(audio_np)
+        # Zero-copy int16 view of the PCM bytes, normalized inside the window
+        with self._buf_lock:
+            self._write(np.frombuffer(audio_bytes, dtype=np.int16))
+            total_samples = self._wpos
         
         # Check if we have enough audio and enough time has passed
         current_time = time.time()
-        total_samples = sum(len(chunk) for chunk in self.audio_buffer)
         
         if (total_samples > self.sample_rate * self.buffer_duration and 
             current_time - self.last_processing_time > self.processing_interval):
-            return self.process_buffer()
+            try:
+                self._work_q.put_nowait(True)
+            except queue.Full:
+                # Whisper is still busy with the previous window
+                return False
+            return True
         
-        return ""
+        return False
     
     def process_buffer(self):
         """Process accumulated audio buffer and return transcription"""
-        if self.model is None or not self.audio_buffer:
+        if self.model is None:
             return ""
         
+        with self._buf_lock:
+            # Snapshot - the window keeps filling while Whisper runs
+            audio = self._buf[:self._wpos].copy()
+        
         try:
-            # Combine audio chunks
-            audio = np.concatenate(self.audio_buffer)
-            
             # Ensure minimum length
             if len(audio) < self.sample_rate * 0.5:  # Less than 0.5 seconds
                 return ""
             
+            # Voice gate: skip the encoder unless the window holds real speech
+            speech = audio
+            if self.vad is not None:
+                speech_ts = self.vad(audio, self.vad_options)
+                speech_samples = sum(ts["end"] - ts["start"] for ts in speech_ts)
+                if speech_samples < self.sample_rate * self.min_speech_duration:
+                    self._consume(len(audio))
+                    return ""
+                # Only the speech goes to the encoder
+                speech = np.concatenate([audio[ts["start"]:ts["end"]] for ts in speech_ts])
+            
             # Transcribe with Whisper
             result = self.model.transcribe(
-                audio,
+                speech,
                 language="en",  # English language
                 task="transcribe",
-                fp16=False,     # Use CPU (set to True for GPU)
+                fp16=self.model.device.type == "cuda",  # half precision only helps on GPU
+                # Plain greedy decoding: beam search and best-of sampling each
+                # multiply decoder passes per window
                 temperature=0.0,
-                best_of=5,
-                beam_size=5,
+                best_of=None,
+                beam_size=None,
                 condition_on_previous_text=False  # Better for real-time
             )
             
-            text = result.get("text", "").strip()
+            text = self._clean_transcription(result.get("text", "").strip())
             
             if text:
-                print(f"🎤 Whisper transcribed: {text}")
+                tokens = frozenset(text.lower().split())
+                if self._is_too_similar(tokens, self._last_tokens):
+                    # A repeat of the last window: drop it and wait a full interval
+                    self._consume(len(audio))
+                    self.last_processing_time = time.time()
+                    return ""
+                self._last_tokens = tokens
+                log.debug("🎤 Whisper transcribed: %s", text)
                 
                 # Clear buffer (keep last 0.5 seconds for continuity)
                 keep_samples = int(self.sample_rate * 0.5)
-                if len(audio) > keep_samples:
-                    self.audio_buffer = [audio[-keep_samples:]]
-                else:
-                    self.audio_buffer = [audio]
+                self._consume(max(len(audio) - keep_samples, 0))
                 
                 self.last_processing_time = time.time()
                 return text
                 
         except Exception as e:
-            print(f"❌ Whisper transcription error: {e}")
+            log.warning("❌ Whisper transcription error: %s", e)
         
         # Clear buffer on error
-        self.audio_buffer = []
+        self._consume(len(audio))
         return ""
+    
+    def _clean_transcription(self, text):
+        """Clean up transcription text"""
+        if not text:
+            return ""
+        
+        words = text.split()
+        if len(words) > 10:
+            # One pass builds both the diversity count and the deduped text
+            seen = set()
+            cleaned = []
+            for word in words:
+                if word not in seen:
+                    seen.add(word)
+                    cleaned.append(word)
+            if len(seen) / len(words) < 0.3:
+                text = " ".join(cleaned[:20])
+        
+        # One pass over the text instead of three replace() scans
+        text = _CLEAN_RE.sub(_clean_repl, text)
+        
+        return text.strip()
+    
+    def _is_too_similar(self, words1, words2, threshold=0.7):
+        """Check if two token sets are too similar (Jaccard)"""
+        if not words1 or not words2:
+            return False
+        
+        # Jaccard can't exceed min/max of the set sizes - skip the
+        # intersection when the sizes alone rule a match out
+        small, large = sorted((len(words1), len(words2)))
+        if small <= threshold * large:
+            return False
+        
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
+        return intersection / union > threshold
+    
+    def _write(self, samples):
+        """Append int16 samples to the window as float32, dropping the oldest audio when full"""
+        capacity = len(self._buf)
+        samples = samples[-capacity:]
+        n = len(samples)
+        overflow = self._wpos + n - capacity
+        if overflow > 0:
+            self._slide(overflow)
+        # One fused pass converts and scales straight into the window
+        np.multiply(samples, np.float32(1 / 32768.0),
+                    out=self._buf[self._wpos:self._wpos + n], casting="unsafe")
+        self._wpos += n
+    
+    def _consume(self, count):
+        """Drop the first count samples of the window"""
+        with self._buf_lock:
+            self._slide(count)
+    
+    def _slide(self, count):
+        """Shift the unconsumed samples to the front; caller holds _buf_lock"""
+        remaining = self._wpos - count
+        if remaining > 0:
+            self._buf[:remaining] = self._buf[count:self._wpos]
+        self._wpos = max(remaining, 0)
 
 # ==========================================================
 # Flutter-Style Teacher Session Page (UPDATED WITH WHISPER)
@@ -667,9 +877,13 @@ class TeacherSessionPage(QWidget):
         self.last_full_transcript = ""
         self.currently_speaking_word = ""
         
-        # Initialize Whisper STT Processor
+        # Initialize Whisper STT Processor - it loads the model and transcribes
+        # on its own thread, fed straight from the audio callback
         print("Initializing Whisper STT...")
         self.whisper_processor = WhisperSTTProcessor(model_size="base")  # Change to "small" or "medium" for better accuracy
+        self.whisper_processor.model_loaded.connect(self.on_whisper_loaded)
+        self.whisper_processor.transcription_ready.connect(self.on_transcription_ready)
+        self.whisper_processor.start()
         
         # TTS tracking to prevent duplicates
         self.last_spoken_content = ""
@@ -679,6 +893,8 @@ class TeacherSessionPage(QWidget):
         
         # Create session with retry capability
         self.session = self._create_session()
+        # Transcript updates are merged for 100 ms and sent off the UI thread
+        self.firebase_writer = FirebaseBatchWriter(session_id, parent=self)
 
         self.init_ui()
         self.start_student_listener()
@@ -1082,9 +1298,6 @@ class TeacherSessionPage(QWidget):
         layout.addWidget(content_widget)
 
         self.setLayout(layout)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.process_audio)
-        self.timer.start(100)  # Check audio every 100ms
 
     def update_student_name_display(self, student_name):
         """Update student name display"""
@@ -1224,30 +1437,18 @@ class TeacherSessionPage(QWidget):
     def upload_chat_to_firebase(self, message):
         """Upload teacher's chat message to Firebase"""
         try:
-            response = self.session.get(f"{FIREBASE_URL}/sessions/{self.session_id}.json")
-            if response.status_code == 200:
-                session_data = response.json() or {}
-                existing_chat = session_data.get("chat_messages", [])
-                
-                chat_data = {
-                    "sender": "teacher",
-                    "message": message,
-                    "timestamp": int(time.time())
-                }
-                existing_chat.append(chat_data)
-                
-                update_data = {
-                    "chat_messages": existing_chat,
-                    "last_updated": int(time.time())
-                }
-                
-                response = self.session.patch(
-                    f"{FIREBASE_URL}/sessions/{self.session_id}.json",
-                    json=update_data,
-                    timeout=5,
-                    verify=False
-                )
-                return response.status_code == 200
+            chat_data = {
+                "sender": "teacher",
+                "message": message,
+                "timestamp": int(time.time())
+            }
+            # POST appends a push-ID child; no need to fetch the session first
+            response = self.session.post(
+                f"{FIREBASE_URL}/sessions/{self.session_id}/chat_messages.json",
+                json=chat_data,
+                timeout=5
+            )
+            return response.status_code == 200
         except Exception as e:
             print(f"Chat upload error: {e}")
         return False
@@ -1328,31 +1529,27 @@ class TeacherSessionPage(QWidget):
         """Update teacher's transcript in Firebase"""
         if not self.session_id:
             return False
-        try:
-            self.session.patch(
-                f"{FIREBASE_URL}/sessions/{self.session_id}.json",
-                json={"current_transcript": transcript, "last_updated": time.time()},
-                timeout=5,
-                verify=False
-            )
-            return True
-        except:
-            return False
+        self.firebase_writer.update("current_transcript", transcript)
+        self.firebase_writer.update("last_updated", SERVER_TIMESTAMP)
+        return True
 
     def cleanup_firebase_session(self):
         """Clean up Firebase session and resources"""
+        self.firebase_writer.clear()
         if self.session_id:
             try:
                 self.session.delete(
                     f"{FIREBASE_URL}/sessions/{self.session_id}.json",
-                    timeout=5,
-                    verify=False
+                    timeout=5
                 )
             except:
                 pass
         if self.student_listener:
             self.student_listener.stop()
             self.student_listener.wait(500)
+        if self.whisper_processor:
+            self.whisper_processor.stop()
+            self.whisper_processor.wait(1000)
         if self.tts_engine:
             self.tts_engine.stop()
         if self.stream:
@@ -1416,23 +1613,22 @@ class TeacherSessionPage(QWidget):
 
     def audio_callback(self, indata, frames, time, status):
         """Audio callback for capturing microphone input"""
-        audio_queue.put(bytes(indata))
+        # Copies into the processor's window; Whisper runs on its own thread
+        self.whisper_processor.add_audio_chunk(indata)
 
-    def process_audio(self):
-        """Process audio queue with Whisper"""
-        if not self.listening or self.whisper_processor.model is None:
-            return
-            
-        # Process all audio chunks in queue
-        while not audio_queue.empty():
-            data = audio_queue.get()
-            # Send to Whisper processor
-            text = self.whisper_processor.add_audio_chunk(data)
-            
-            if text and text.strip():
-                self.current_transcript = text
-                self.teacher_transcript_label.setText(text)
-                self.update_transcript_in_firebase(text)
+    def on_whisper_loaded(self, success, message):
+        """Called once the Whisper thread has loaded its model"""
+        if success:
+            log.info("✅ %s", message)
+        else:
+            log.error("❌ %s", message)
+
+    def on_transcription_ready(self, text):
+        """Handle a finished transcription from the Whisper thread"""
+        if text and text.strip():
+            self.current_transcript = text
+            self.teacher_transcript_label.setText(text)
+            self.update_transcript_in_firebase(text)
 
     def closeEvent(self, event):
         """Handle window close event"""
@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions as gexc
+
+import app_window
+from app_window import AIAssistant
+
+
+RATE_LIMIT = "Quota exceeded for metric: GenerateRequestsPerMinutePerProjectPerModel"
+DAILY_QUOTA = "Quota exceeded for metric: GenerateRequestsPerDayPerProjectPerModel"
+
+
+class IsRetryableTest(unittest.TestCase):
+    def test_connection_errors_are_retried(self):
+        self.assertTrue(AIAssistant._is_retryable(ConnectionError("reset")))
+        self.assertTrue(AIAssistant._is_retryable(TimeoutError("timed out")))
+    
+    def test_plain_resource_exhausted_is_retried(self):
+        self.assertTrue(AIAssistant._is_retryable(gexc.ResourceExhausted("Resource has been exhausted")))
+    
+    def test_per_minute_quota_is_retried(self):
+        self.assertTrue(AIAssistant._is_retryable(gexc.ResourceExhausted(RATE_LIMIT)))
+    
+    def test_daily_quota_in_details_is_not_retried(self):
+        error = gexc.ResourceExhausted("Resource has been exhausted", details=[DAILY_QUOTA])
+        self.assertFalse(AIAssistant._is_retryable(error))
+    
+    def test_billing_message_is_not_retried(self):
+        error = gexc.ResourceExhausted("You exceeded your current quota, please check your plan and billing details")
+        self.assertFalse(AIAssistant._is_retryable(error))
+    
+    def test_service_unavailable_and_deadline_are_retried(self):
+        self.assertTrue(AIAssistant._is_retryable(gexc.ServiceUnavailable("overloaded")))
+        self.assertTrue(AIAssistant._is_retryable(gexc.DeadlineExceeded("deadline")))
+    
+    def test_bad_key_is_not_retried(self):
+        self.assertFalse(AIAssistant._is_retryable(gexc.InvalidArgument("API_KEY_INVALID")))
+        self.assertFalse(AIAssistant._is_retryable(gexc.PermissionDenied("denied")))
+    
+    def test_message_fallback_without_api_core(self):
+        with mock.patch.object(app_window, "gexc", None):
+            self.assertTrue(AIAssistant._is_retryable(RuntimeError("429 Too Many Requests")))
+            self.assertTrue(AIAssistant._is_retryable(RuntimeError("503 Service Unavailable")))
+            self.assertTrue(AIAssistant._is_retryable(RuntimeError("429 " + RATE_LIMIT)))
+            self.assertFalse(AIAssistant._is_retryable(RuntimeError("429 " + DAILY_QUOTA)))
+            self.assertFalse(AIAssistant._is_retryable(RuntimeError("400 API_KEY_INVALID")))
+
+
+class FriendlyErrorTest(unittest.TestCase):
+    def test_rate_limit_reports_too_many_requests(self):
+        message = AIAssistant._friendly_error(gexc.ResourceExhausted(RATE_LIMIT))
+        self.assertEqual(message, "Too many requests. Please wait a moment.")
+    
+    def test_quota_reports_quota_exceeded(self):
+        message = AIAssistant._friendly_error(gexc.ResourceExhausted(DAILY_QUOTA))
+        self.assertEqual(message, "API quota exceeded. Please try again later.")
+
+
+if __name__ == "__main__":
+    unittest.main()